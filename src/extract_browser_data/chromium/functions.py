@@ -17,12 +17,16 @@
 
 import datetime
 import json
+from array import array
 from os.path import isfile as file_exists
 from pathlib import Path
+from sqlite3 import Connection, Cursor
 from typing import Iterator, List, Optional, Union
 
 from .. import util
-from ..common import Bookmark, Cookie, Extension, ProfileState, URLVisit
+from ..common import (Bookmark, Cookie, CookieColumns, Extension,
+                      HistoryColumns, HistoryWatermark, ProfileState, URLVisit)
+from ..epoch import WEBKIT_EPOCH_OFFSET, webkit_to_unix_column
 from .util import dt_from_webkit_epoch
 
 # import platform specific functions
@@ -85,25 +89,77 @@ def read_extensions(file: Union[str, Path]) -> List[Extension]:
    return extensions
 
 
-def read_history(file: Union[str, Path]) -> Iterator[URLVisit]:
-   with util.open_database(file, readonly=True) as conn:
-      db_version, db_lsv = util.read_database_version(conn, use_meta=True)
+def _select_history(conn: Connection, file: Union[str, Path],
+                    since: Optional[HistoryWatermark]) -> Cursor:
+   '''Checks the schema and executes the history query'''
+   db_version, db_lsv = util.read_database_version(conn, use_meta=True)
 
-      if db_lsv > 42:
-         raise util.UnsupportedSchema(file, (db_version, db_lsv))
+   if db_lsv > 42:
+      raise util.UnsupportedSchema(file, (db_version, db_lsv))
 
-      cur = conn.execute(r'''SELECT title,
+   if since is None:
+      return conn.execute(r'''SELECT id,
+                              title,
                               url,
                               visit_count,
                               last_visit_time
                               FROM urls WHERE hidden = 0
                               ORDER BY last_visit_time DESC''')
 
-      for title, url, visit_count, last_visit_time in cur.fetchall():
-         yield URLVisit(url, title, dt_from_webkit_epoch(last_visit_time),
+   # only urls visited after the watermark, oldest first so the watermark can
+   # be advanced while reading
+   return conn.execute(
+       r'''SELECT id,
+               title,
+               url,
+               visit_count,
+               last_visit_time
+               FROM urls WHERE hidden = 0
+               AND (last_visit_time > ?
+                    OR (last_visit_time = ? AND id > ?))
+               ORDER BY last_visit_time ASC, id ASC''',
+       (since.last_visit, since.last_visit, since.id))
+
+
+def read_history(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE,
+    since: Optional[HistoryWatermark] = None) -> Iterator[URLVisit]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_history(conn, file, since)
+
+      for _id, title, url, visit_count, last_visit_time in util.iter_rows(
+          cur, batch_size):
+         if since is not None:
+            since.last_visit = last_visit_time
+            since.id = _id
+
+         # converted to datetime only when accessed
+         yield URLVisit(url, title, last_visit_time - WEBKIT_EPOCH_OFFSET,
                         visit_count)
 
 
+def read_history_columns(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE,
+    since: Optional[HistoryWatermark] = None) -> Iterator[HistoryColumns]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_history(conn, file, since)
+
+      for rows in util.iter_batches(cur, batch_size):
+         ids, titles, urls, visit_counts, last_visits = zip(*rows)
+
+         if since is not None:
+            since.last_visit = last_visits[-1]
+            since.id = ids[-1]
+
+         yield HistoryColumns(list(urls), list(titles),
+                              webkit_to_unix_column(last_visits),
+                              array('q', visit_counts))
+
+
 def read_bookmarks(file: Union[str, Path]) -> Optional[Bookmark]:
    if not file_exists(file):
       return None
@@ -138,30 +194,60 @@ def read_bookmarks(file: Union[str, Path]) -> Optional[Bookmark]:
                               [toolbar, other, synced])
 
 
-def read_cookies(file: Union[str, Path]) -> Iterator[Cookie]:
-   with util.open_database(file, readonly=True) as conn:
-      db_version, db_lsv = util.read_database_version(conn, use_meta=True)
+def _select_cookies(conn: Connection, file: Union[str, Path]) -> Cursor:
+   '''Checks the schema and executes the cookie query'''
+   db_version, db_lsv = util.read_database_version(conn, use_meta=True)
+
+   if db_lsv > 12:
+      raise util.UnsupportedSchema(file, (db_version, db_lsv))
+
+   # TODO decrypt the cookie data
+
+   return conn.execute(r'''SELECT name,
+                              host_key,
+                              value,
+                              path,
+                              expires_utc,
+                              creation_utc,
+                              last_access_utc
+                          FROM cookies
+                          ORDER BY last_access_utc DESC''')
 
-      if db_lsv > 12:
-         raise util.UnsupportedSchema(file, (db_version, db_lsv))
 
-      # TODO decrypt the cookie data
+def read_cookies(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE) -> Iterator[Cookie]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_cookies(conn, file)
 
-      cur = conn.execute(r'''SELECT name,
-                                 host_key,
-                                 value,
-                                 path,
-                                 expires_utc,
-                                 creation_utc,
-                                 last_access_utc
-                             FROM cookies
-                             ORDER BY last_access_utc DESC''')
+      offset = WEBKIT_EPOCH_OFFSET
 
-      for i in cur.fetchall():
+      # dates are converted to datetime only when accessed
+      for i in util.iter_rows(cur, batch_size):
          yield Cookie(base_domain=i[1],
                       name=i[0],
                       path=i[3],
                       value=i[2],
-                      expiry=dt_from_webkit_epoch(i[4]),
-                      date_added=dt_from_webkit_epoch(i[5]),
-                      last_accessed=dt_from_webkit_epoch(i[6]))
+                      expiry=i[4] - offset,
+                      date_added=i[5] - offset,
+                      last_accessed=i[6] - offset)
+
+
+def read_cookies_columns(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE) -> Iterator[CookieColumns]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_cookies(conn, file)
+
+      for rows in util.iter_batches(cur, batch_size):
+         (names, host_keys, values, paths, expiries, creation_times,
+          last_accesses) = zip(*rows)
+
+         # domains, names and paths repeat a lot so they are interned
+         yield CookieColumns(util.intern_all(host_keys),
+                             util.intern_all(names), util.intern_all(paths),
+                             list(values), webkit_to_unix_column(expiries),
+                             webkit_to_unix_column(creation_times),
+                             webkit_to_unix_column(last_accesses))
@@ -17,7 +17,8 @@
 
 from typing import Iterator, List, Optional
 
-from ..common import Bookmark, Cookie, Extension, URLVisit
+from ..common import (Bookmark, Cookie, CookieColumns, Extension,
+                      HistoryColumns, HistoryWatermark, URLVisit)
 from ..profile import Reader
 from . import functions as func
 from .files import BOOKMARKS, COOKIES, HISTORY, SECURE_PREFERENCES
@@ -29,11 +30,25 @@ class ChromiumReader(Reader):
       return func.read_extensions(
           self.profile.path.joinpath(SECURE_PREFERENCES))
 
-   def history(self) -> Iterator[URLVisit]:
-      return func.read_history(self.profile.path.joinpath(HISTORY))
+   def history(self,
+               since: Optional[HistoryWatermark] = None) -> Iterator[URLVisit]:
+      return func.read_history(self._path(HISTORY), self._snapshot(HISTORY),
+                               self.batch_size, since)
+
+   def history_columns(
+       self,
+       since: Optional[HistoryWatermark] = None) -> Iterator[HistoryColumns]:
+      return func.read_history_columns(self._path(HISTORY),
+                                       self._snapshot(HISTORY), self.batch_size,
+                                       since)
 
    def bookmarks(self) -> Optional[Bookmark]:
       return func.read_bookmarks(self.profile.path.joinpath(BOOKMARKS))
 
    def cookies(self) -> Iterator[Cookie]:
-      return func.read_cookies(self.profile.path.joinpath(COOKIES))
+      return func.read_cookies(self._path(COOKIES), self._snapshot(COOKIES),
+                               self.batch_size)
+
+   def cookies_columns(self) -> Iterator[CookieColumns]:
+      return func.read_cookies_columns(self._path(COOKIES),
+                                       self._snapshot(COOKIES), self.batch_size)
@@ -18,6 +18,8 @@
 from datetime import datetime, timedelta
 from typing import Union
 
+from ..epoch import UNIX_EPOCH, WEBKIT_EPOCH_OFFSET
+
 
 def dt_from_webkit_epoch(epoch: Union[str, int]) -> datetime:
    """Converts webkit format epoch into :class:`datetime.datetime`
@@ -41,4 +43,4 @@ def dt_from_webkit_epoch(epoch: Union[str, int]) -> datetime:
    if isinstance(epoch, str):
       epoch = int(epoch)
 
-   return datetime(1601, 1, 1) + timedelta(microseconds=epoch)
+   return UNIX_EPOCH + timedelta(0, 0, epoch - WEBKIT_EPOCH_OFFSET)
@@ -16,9 +16,23 @@
 # limitations under the License.
 # pylint: disable=too-many-instance-attributes,too-many-arguments,too-few-public-methods
 
+import json
+from array import array
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .epoch import NULL_TIMESTAMP, LazyTimestamp, to_datetimes
+
+
+def _to_numpy(column: Any) -> Any:
+   '''Converts column into a numpy array without copying int64 columns'''
+   import numpy  # pylint: disable=import-outside-toplevel
+
+   if isinstance(column, array):
+      return numpy.frombuffer(column, dtype=numpy.int64)
+
+   return numpy.array(column, dtype=object)
 
 
 class ProfileState(Enum):
@@ -80,8 +94,14 @@ class URLVisit:
       last_visit: Date last on which the url was last visited
       visit_count: Number of times the url was visited
       extras: Data that is not available on all browsers
+
+   Notice:
+      ``last_visit`` can be also set as microseconds since unix epoch, in which
+      case it's converted to datetime only when accessed
    """
-   def __init__(self, url: str, title: str, last_visit: datetime,
+   last_visit = LazyTimestamp()
+
+   def __init__(self, url: str, title: str, last_visit: Union[int, datetime],
                 visit_count: int, **extras: Dict[str, Any]):
       self.url = url
       self.title = title
@@ -93,6 +113,54 @@ class URLVisit:
       return "'{}' {}".format(self.title, self.url)
 
 
+class HistoryWatermark:
+   """Position in the history up to which it was already read, used to read
+   only urls visited since the last extraction
+
+   The watermark is advanced while the history is read so after reading it
+   points to the last url read and can be stored until the next extraction
+
+   Attributes:
+      last_visit: Last visit time of the last url read (in the format used by
+         the browser so it should not be shared between browsers)
+      id: Row id of the last url read, used to order urls visited at the same
+         time
+   """
+   __slots__ = ['last_visit', 'id']
+
+   def __init__(self, last_visit: int = 0, id: int = 0) -> None:
+      # pylint: disable=redefined-builtin
+      self.last_visit = last_visit
+      self.id = id
+
+   def __str__(self) -> str:
+      return '{}:{}'.format(self.last_visit, self.id)
+
+   def __eq__(self, other: Any) -> bool:
+      if not isinstance(other, HistoryWatermark):
+         return NotImplemented
+
+      return (self.last_visit, self.id) == (other.last_visit, other.id)
+
+   def to_dict(self) -> Dict[str, int]:
+      '''Returns the watermark as a dict'''
+      return {'last_visit': self.last_visit, 'id': self.id}
+
+   def to_json(self) -> str:
+      '''Serializes the watermark into json'''
+      return json.dumps(self.to_dict())
+
+   @classmethod
+   def from_dict(cls, data: Dict[str, int]) -> 'HistoryWatermark':
+      '''Creates watermark from dict created by :meth:`to_dict`'''
+      return cls(data['last_visit'], data['id'])
+
+   @classmethod
+   def from_json(cls, data: str) -> 'HistoryWatermark':
+      '''Deserializes watermark from json created by :meth:`to_json`'''
+      return cls.from_dict(json.loads(data))
+
+
 class Bookmark:
    """Bookmark class represents a bookmark or a bookmark folder
 
@@ -165,6 +233,47 @@ class Bookmark:
       return cls(url, title, date_added, None, **extras)
 
 
+class HistoryColumns:
+   """Batch of browsing history stored as parallel columns instead of
+   :class:`URLVisit` objects, timestamps are stored as microseconds since unix
+   epoch (:data:`.epoch.NULL_TIMESTAMP` if missing)
+
+   Attributes:
+      url: Urls visited
+      title: Titles of the urls visited
+      last_visit: Last visit times
+      visit_count: Number of times each url was visited
+   """
+   __slots__ = ['url', 'title', 'last_visit', 'visit_count']
+
+   def __init__(self, url: List[str], title: List[str],
+                last_visit: 'array[int]', visit_count: 'array[int]') -> None:
+      self.url = url
+      self.title = title
+      self.last_visit = last_visit
+      self.visit_count = visit_count
+
+   def __len__(self) -> int:
+      return len(self.url)
+
+   def to_objects(self) -> List[URLVisit]:
+      '''Converts the batch into a list of :class:`URLVisit`'''
+      return [
+          URLVisit(*i) for i in zip(self.url, self.title,
+                                    to_datetimes(self.last_visit),
+                                    self.visit_count)
+      ]
+
+   def to_numpy(self) -> Dict[str, Any]:
+      """Converts columns into numpy arrays, timestamps and counts are not
+      copied
+
+      Notice:
+         Requires numpy to be installed
+      """
+      return {i: _to_numpy(getattr(self, i)) for i in self.__slots__}
+
+
 class Cookie:
    """Cookie class, represents a single cookie for a domain
 
@@ -177,19 +286,24 @@ class Cookie:
       date_added: Date when cookie was created
       last_accessed: Date when cookie was last accessed
       extras: Cookie data which isn't available on all browsers
+
+   Notice:
+      Dates can be also set as microseconds since unix epoch, in which case
+      they are converted to datetime only when accessed
    """
    base_domain: str
    name: str
    path: str
    value: str
-   expiry: datetime
-   date_added: datetime
-   last_accessed: datetime
    extras: Dict[str, Any]
 
+   expiry = LazyTimestamp()
+   date_added = LazyTimestamp()
+   last_accessed = LazyTimestamp()
+
    __slots__ = [
-       'base_domain', 'name', 'path', 'value', 'expiry', 'date_added',
-       'last_accessed', 'extras'
+       'base_domain', 'name', 'path', 'value', '_expiry', '_date_added',
+       '_last_accessed', 'extras'
    ]
 
    def __init__(self, **kwargs: Any) -> None:
@@ -209,3 +323,66 @@ class Cookie:
 
    def __str__(self) -> str:
       return "{} {} {}".format(self.base_domain, self.path, self.name)
+
+
+class CookieColumns:
+   """Batch of cookies stored as parallel columns instead of :class:`Cookie`
+   objects, timestamps are stored as microseconds since unix epoch
+   (:data:`.epoch.NULL_TIMESTAMP` if missing)
+
+   Attributes:
+      base_domain: Base domains which use the cookies
+      name: Names of the cookies
+      path: Paths of the cookies
+      value: Values of the cookies
+      expiry: Dates when cookies expire
+      date_added: Dates when cookies were created
+      last_accessed: Dates when cookies were last accessed
+      extras: Columns which aren't available on all browsers
+   """
+   __slots__ = [
+       'base_domain', 'name', 'path', 'value', 'expiry', 'date_added',
+       'last_accessed', 'extras'
+   ]
+
+   def __init__(self, base_domain: List[Optional[str]],
+                name: List[Optional[str]], path: List[Optional[str]],
+                value: List[str], expiry: 'array[int]',
+                date_added: 'array[int]', last_accessed: 'array[int]',
+                **extras: List[Any]) -> None:
+      self.base_domain = base_domain
+      self.name = name
+      self.path = path
+      self.value = value
+      self.expiry = expiry
+      self.date_added = date_added
+      self.last_accessed = last_accessed
+      self.extras = extras
+
+   def __len__(self) -> int:
+      return len(self.name)
+
+   def to_objects(self) -> List[Cookie]:
+      '''Converts the batch into a list of :class:`Cookie`'''
+      columns: List[Sequence[Any]] = [
+          self.base_domain, self.name, self.path, self.value,
+          to_datetimes(self.expiry),
+          to_datetimes(self.date_added),
+          to_datetimes(self.last_accessed)
+      ]
+      columns.extend(self.extras.values())
+
+      keys = self.__slots__[:-1] + list(self.extras.keys())
+
+      return [Cookie(**dict(zip(keys, i))) for i in zip(*columns)]
+
+   def to_numpy(self) -> Dict[str, Any]:
+      """Converts columns into numpy arrays, timestamps are not copied
+
+      Notice:
+         Requires numpy to be installed
+      """
+      result = {i: _to_numpy(getattr(self, i)) for i in self.__slots__[:-1]}
+      result.update((k, _to_numpy(v)) for k, v in self.extras.items())
+
+      return result
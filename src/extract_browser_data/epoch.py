@@ -0,0 +1,130 @@
+# (https://github.com/sandorex/extract-browser-data.py)
+# extract-browser-data
+#
+# Copyright 2020 Aleksandar Radivojevic
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# 	 http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+'''Conversion of timestamps used by browsers into datetime
+
+All timestamps are normalized to microseconds since unix epoch, which is what
+Firefox uses natively and what webkit timestamps are after subtracting
+:data:`WEBKIT_EPOCH_OFFSET`
+'''
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+
+WEBKIT_EPOCH_OFFSET = 11644473600000000
+'''Microseconds between webkit epoch (1601-01-01) and unix epoch'''
+
+NULL_TIMESTAMP = -2**63
+'''Value used for missing timestamps in int64 columns (same as numpy NaT)'''
+
+
+def from_unix_us(value: Optional[int]) -> Optional[datetime]:
+   '''Converts microseconds since unix epoch into datetime'''
+   if value is None:
+      return None
+
+   # positional arguments are quite a bit faster than keyword ones
+   return UNIX_EPOCH + timedelta(0, 0, value)
+
+
+def to_unix_us(value: Optional[datetime]) -> Optional[int]:
+   '''Converts datetime into microseconds since unix epoch'''
+   if value is None:
+      return None
+
+   delta = value - UNIX_EPOCH
+   return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def to_datetimes(column: Sequence[int]) -> List[Any]:
+   """Converts a whole column of microseconds since unix epoch into datetimes
+   (:data:`NULL_TIMESTAMP` is converted to ``None``)
+
+   Uses numpy if it's installed, in which case an int64 array is converted
+   without copying
+   """
+   if numpy is not None:
+      if isinstance(column, array):
+         values = numpy.frombuffer(column, dtype=numpy.int64)
+      else:
+         values = numpy.asarray(column, dtype=numpy.int64)
+
+      # NaT is converted to None
+      return values.view('datetime64[us]').tolist()  # type: ignore
+
+   epoch = UNIX_EPOCH
+   delta = timedelta
+   return [
+       epoch + delta(0, 0, i) if i != NULL_TIMESTAMP else None for i in column
+   ]
+
+
+def webkit_to_unix_column(column: Iterable[Optional[int]]) -> 'array[int]':
+   """Converts webkit timestamps into an int64 array of microseconds since unix
+   epoch (``None`` is converted to :data:`NULL_TIMESTAMP`)
+   """
+   offset = WEBKIT_EPOCH_OFFSET
+   return array('q', (i - offset if i is not None else NULL_TIMESTAMP
+                      for i in column))
+
+
+class LazyTimestamp:
+   """Descriptor for timestamp attributes which keeps the raw microseconds since
+   unix epoch until the attribute is accessed for the first time
+
+   The value is stored in an attribute with the same name prefixed with an
+   underscore, so classes with ``__slots__`` must declare it
+
+   Both datetime and microseconds since unix epoch (int) can be assigned
+   """
+   def __init__(self) -> None:
+      self.name = ''
+      self.attr = ''
+
+   def __set_name__(self, owner: Any, name: str) -> None:
+      self.name = name
+      self.attr = '_' + name
+
+   def __get__(self, obj: Any, owner: Any = None) -> Any:
+      if obj is None:
+         return self
+
+      value = getattr(obj, self.attr)
+      if value.__class__ is int:
+         value = UNIX_EPOCH + timedelta(0, 0, value)
+         setattr(obj, self.attr, value)
+
+      return value
+
+   def __set__(self, obj: Any, value: Union[None, int, datetime]) -> None:
+      setattr(obj, self.attr, value)
+
+   def raw(self, obj: Any) -> Optional[int]:
+      '''Returns the value as microseconds since unix epoch without converting
+      it into datetime'''
+      value = getattr(obj, self.attr)
+      if value is None or value.__class__ is int:
+         return value
+
+      return to_unix_us(value)
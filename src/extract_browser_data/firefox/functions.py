@@ -18,12 +18,16 @@
 import datetime
 import json
 import re
+from array import array
 from os.path import isfile as file_exists
 from pathlib import Path
+from sqlite3 import Connection, Cursor
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from .. import util
-from ..common import Bookmark, Cookie, Extension, ProfileState, URLVisit
+from ..common import (Bookmark, Cookie, CookieColumns, Extension,
+                      HistoryColumns, HistoryWatermark, ProfileState, URLVisit)
+from ..epoch import NULL_TIMESTAMP
 from .util import TimeUnit, dt_from_epoch, open_lz4
 
 # import platform specific functions
@@ -195,26 +199,73 @@ def read_extensions(file: Union[str, Path]) -> List[Extension]:
    return extensions
 
 
-def read_history(file: Union[str, Path]) -> Iterator[URLVisit]:
-   with util.open_database(file, readonly=True) as conn:
-      db_version = util.read_database_version(conn)[0]
+def _select_history(conn: Connection, file: Union[str, Path],
+                    since: Optional[HistoryWatermark]) -> Cursor:
+   '''Checks the schema and executes the history query'''
+   db_version = util.read_database_version(conn)[0]
 
-      if db_version != 53:
-         raise util.UnsupportedSchema(file, db_version)
+   if db_version != 53:
+      raise util.UnsupportedSchema(file, db_version)
 
-      cur = conn.execute(r'''SELECT url, title, last_visit_date, visit_count
+   if since is None:
+      return conn.execute(r'''SELECT id, url, title, last_visit_date,
+                                  visit_count
                FROM moz_places
                WHERE last_visit_date IS NOT NULL
                ORDER BY last_visit_date DESC''')
 
-      for url, title, last_visit, visit_count in cur.fetchall():
-         yield URLVisit(url, title,
-                        dt_from_epoch(last_visit, TimeUnit.Microseconds),
-                        visit_count)
-
-
-def read_bookmarks(file: Union[str, Path]) -> Bookmark:
-   with util.open_database(file, readonly=True) as conn:
+   # only urls visited after the watermark, oldest first so the watermark can
+   # be advanced while reading
+   return conn.execute(
+       r'''SELECT id, url, title, last_visit_date, visit_count
+            FROM moz_places
+            WHERE last_visit_date > ?
+            OR (last_visit_date = ? AND id > ?)
+            ORDER BY last_visit_date ASC, id ASC''',
+       (since.last_visit, since.last_visit, since.id))
+
+
+def read_history(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE,
+    since: Optional[HistoryWatermark] = None) -> Iterator[URLVisit]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_history(conn, file, since)
+
+      for _id, url, title, last_visit, visit_count in util.iter_rows(
+          cur, batch_size):
+         if since is not None:
+            since.last_visit = last_visit
+            since.id = _id
+
+         # already in microseconds, converted to datetime only when accessed
+         yield URLVisit(url, title, last_visit, visit_count)
+
+
+def read_history_columns(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE,
+    since: Optional[HistoryWatermark] = None) -> Iterator[HistoryColumns]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_history(conn, file, since)
+
+      for rows in util.iter_batches(cur, batch_size):
+         ids, urls, titles, last_visits, visit_counts = zip(*rows)
+
+         if since is not None:
+            since.last_visit = last_visits[-1]
+            since.id = ids[-1]
+
+         # last_visit_date is already in microseconds since unix epoch
+         yield HistoryColumns(list(urls), list(titles), array('q', last_visits),
+                              array('q', visit_counts))
+
+
+def read_bookmarks(file: Union[str, Path],
+                   conn: Optional[Connection] = None) -> Bookmark:
+   with util.use_database(file, conn) as conn:
       db_version = util.read_database_version(conn)[0]
 
       if db_version != 53:
@@ -286,46 +337,87 @@ def read_bookmarks(file: Union[str, Path]) -> Bookmark:
        [toolbar, other_bookmarks, mobile, bookmarks_menu, tags])
 
 
-def read_cookies(file: Union[str, Path]) -> Iterator[Cookie]:
-   with util.open_database(file, readonly=True) as conn:
-      db_version = util.read_database_version(conn)[0]
+def _select_cookies(conn: Connection, file: Union[str, Path]) -> Cursor:
+   '''Checks the schema and executes the cookie query'''
+   db_version = util.read_database_version(conn)[0]
 
-      if db_version != 10:
-         raise util.UnsupportedSchema(file, db_version)
+   if db_version != 10:
+      raise util.UnsupportedSchema(file, db_version)
 
-      cur = conn.execute(r'''SELECT
-                           baseDomain,
-                           name,
-                           path,
-                           value,
-                           originAttributes,
-                           expiry,
-                           creationTime,
-                           lastAccessed
-                           FROM moz_cookies
-                           ORDER BY lastAccessed DESC''')
+   return conn.execute(r'''SELECT
+                        baseDomain,
+                        name,
+                        path,
+                        value,
+                        originAttributes,
+                        expiry,
+                        creationTime,
+                        lastAccessed
+                        FROM moz_cookies
+                        ORDER BY lastAccessed DESC''')
 
-      for (base_domain, name, path, value, attributes, expiry, creation_time,
-           last_accessed) in cur.fetchall():
-         container = None
-         if attributes:
-            # NOTE this is the best way i've thought of to ensure that
-            # attributes haven't changed..
-            match = re.match(r'^\^userContextId=(\d+)$', attributes)
-            if match is None:
-               raise RuntimeError(
-                   f"invalid attributes found in cookie '{attributes}'")
-
-            container = match.group(1)
 
+def _parse_container(attributes: str) -> Optional[str]:
+   '''Reads container id from cookie origin attributes'''
+   if not attributes:
+      return None
+
+   # NOTE this is the best way i've thought of to ensure that
+   # attributes haven't changed..
+   match = re.match(r'^\^userContextId=(\d+)$', attributes)
+   if match is None:
+      raise RuntimeError(f"invalid attributes found in cookie '{attributes}'")
+
+   return match.group(1)
+
+
+def read_cookies(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE) -> Iterator[Cookie]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_cookies(conn, file)
+
+      for (base_domain, name, path, value, attributes, expiry, creation_time,
+           last_accessed) in util.iter_rows(cur, batch_size):
+         # dates are converted to datetime only when accessed
          yield Cookie(
              base_domain=base_domain,
              name=name,
              path=path,
              value=value,
-             expiry=dt_from_epoch(expiry),
-             date_added=dt_from_epoch(creation_time, TimeUnit.Microseconds),
-             last_accessed=dt_from_epoch(last_accessed, TimeUnit.Microseconds),
+             expiry=expiry * 1000000 if expiry is not None else None,
+             date_added=creation_time,
+             last_accessed=last_accessed,
+
+             # extras
+             container=_parse_container(attributes))
+
+
+def read_cookies_columns(
+    file: Union[str, Path],
+    conn: Optional[Connection] = None,
+    batch_size: int = util.DEFAULT_BATCH_SIZE) -> Iterator[CookieColumns]:
+   with util.use_database(file, conn) as conn:
+      cur = _select_cookies(conn, file)
+
+      for rows in util.iter_batches(cur, batch_size):
+         (base_domains, names, paths, values, attributes, expiries,
+          creation_times, last_accesses) = zip(*rows)
+
+         # domains, names and paths repeat a lot so they are interned
+         yield CookieColumns(
+             util.intern_all(base_domains),
+             util.intern_all(names),
+             util.intern_all(paths),
+             list(values),
+             # expiry is in seconds, the rest is already in microseconds
+             array('q', (i * 1000000 if i is not None else NULL_TIMESTAMP
+                         for i in expiries)),
+             array('q', (i if i is not None else NULL_TIMESTAMP
+                         for i in creation_times)),
+             array('q', (i if i is not None else NULL_TIMESTAMP
+                         for i in last_accesses)),
 
              # extras
-             container=container)
+             container=[_parse_container(i) for i in attributes])
@@ -17,7 +17,8 @@
 
 from typing import Any, Dict, Iterator, List, Optional
 
-from ..common import Bookmark, Cookie, Extension, URLVisit
+from ..common import (Bookmark, Cookie, CookieColumns, Extension,
+                      HistoryColumns, HistoryWatermark, URLVisit)
 from ..profile import Reader
 from . import functions as func
 from .files import (CONTAINERS, COOKIES, EXTENSIONS, PLACES, SESSIONSTORE,
@@ -68,11 +69,25 @@ class FirefoxReader(Reader):
    def extensions(self) -> List[Extension]:
       return func.read_extensions(self.profile.path.joinpath(EXTENSIONS))
 
-   def history(self) -> Iterator[URLVisit]:
-      return func.read_history(self.profile.path.joinpath(PLACES))
+   def history(self,
+               since: Optional[HistoryWatermark] = None) -> Iterator[URLVisit]:
+      return func.read_history(self._path(PLACES), self._snapshot(PLACES),
+                               self.batch_size, since)
+
+   def history_columns(
+       self,
+       since: Optional[HistoryWatermark] = None) -> Iterator[HistoryColumns]:
+      return func.read_history_columns(self._path(PLACES),
+                                       self._snapshot(PLACES), self.batch_size,
+                                       since)
 
    def bookmarks(self) -> Bookmark:
-      return func.read_bookmarks(self.profile.path.joinpath(PLACES))
+      return func.read_bookmarks(self._path(PLACES), self._snapshot(PLACES))
 
    def cookies(self) -> Iterator[Cookie]:
-      return func.read_cookies(self.profile.path.joinpath(COOKIES))
+      return func.read_cookies(self._path(COOKIES), self._snapshot(COOKIES),
+                               self.batch_size)
+
+   def cookies_columns(self) -> Iterator[CookieColumns]:
+      return func.read_cookies_columns(self._path(COOKIES),
+                                       self._snapshot(COOKIES), self.batch_size)
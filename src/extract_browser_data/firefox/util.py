@@ -23,6 +23,8 @@ from typing import BinaryIO, Union
 
 from lz4.block import decompress
 
+from ..epoch import UNIX_EPOCH
+
 
 def open_lz4(file: Union[str, Path]) -> BinaryIO:
    """Reads a mozilla lz4 file and decompresses it in memory while returning it
@@ -47,6 +49,13 @@ class TimeUnit(Enum):
    Microseconds = 'microseconds'
 
 
+_MICROSECONDS = {
+    TimeUnit.Seconds: 1000000,
+    TimeUnit.Milliseconds: 1000,
+    TimeUnit.Microseconds: 1
+}
+
+
 def dt_from_epoch(epoch: int,
                   time_unit: TimeUnit = TimeUnit.Seconds) -> datetime:
    """Converts epoch into datetime using any time unit
@@ -62,4 +71,4 @@ def dt_from_epoch(epoch: int,
    if epoch is None:
       return None
 
-   return datetime(1970, 1, 1) + timedelta(**{time_unit.value: epoch})
+   return UNIX_EPOCH + timedelta(0, 0, epoch * _MICROSECONDS[time_unit])
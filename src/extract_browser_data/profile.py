@@ -22,7 +22,8 @@ from sqlite3 import Connection
 from typing import Any, ClassVar, Dict, Iterator, List, Optional, Type, Union
 
 from . import util
-from .common import Bookmark, Cookie, Extension, URLVisit
+from .common import (Bookmark, Cookie, CookieColumns, Extension,
+                     HistoryColumns, HistoryWatermark, URLVisit)
 
 
 class Profile(ABC):
@@ -59,9 +60,10 @@ class Profile(ABC):
       if value is None:
          return self.extras.get(name)
 
-   def reader(self) -> 'Reader':
-      '''Tries to create a reader for the profile'''
-      return self.READER_TYPE(self)
+   def reader(self, **kwargs: Any) -> 'Reader':
+      '''Tries to create a reader for the profile (arguments are passed to the
+      reader)'''
+      return self.READER_TYPE(self, **kwargs)
 
    def writer(self) -> 'Writer':
       '''Tries to create a writer for the profile'''
@@ -112,23 +114,76 @@ class Profile(ABC):
       raise NotImplementedError()
 
 
-# TODO rework reader to cache all the databases if not 'realtime'
 class Reader(ABC):
    """Base class for browser profile reader
 
+   Unless ``realtime`` is true each database is copied once, on first use, and
+   every later query is served from that snapshot so reading history,
+   bookmarks and cookies does not copy the same file over and over
+
+   Tip:
+      It's recommended to use this class as a context manager so the snapshots
+      are deleted as soon as the reading is done
+
    Arguments:
       profile: The profile to read from (must be a subclass of
          :class:`.profile.Profile`)
+      realtime: Read the databases directly on every call instead of reading
+         from the snapshots
+      batch_size: Number of rows fetched at once when iterating over history
+         and cookies
    """
-   def __init__(self, profile: Profile) -> None:
+   def __init__(self,
+                profile: Profile,
+                realtime: bool = False,
+                batch_size: int = util.DEFAULT_BATCH_SIZE) -> None:
       self.profile = profile
+      self.realtime = realtime
+      self.batch_size = batch_size
+      self._snapshots: Dict[Path, util.SnapshotConnection] = {}
+
+   def __enter__(self) -> 'Reader':
+      return self
+
+   def __exit__(self, *args: Any) -> None:
+      self.close()
+
+   def close(self) -> None:
+      '''Closes and deletes all snapshots taken by the reader'''
+      for snapshot in self._snapshots.values():
+         snapshot.close()
+
+      self._snapshots.clear()
+
+   def _path(self, *path: Union[str, Path]) -> Path:
+      '''Returns path relative to profile path'''
+      return self.profile.path.joinpath(*path)
 
    def _open_database(
-       self, *path: Union[str, Path]) -> Union[Connection, util.TempConnection]:
+       self,
+       *path: Union[str, Path]) -> Union[Connection, util.SnapshotConnection]:
       '''Opens a sqlite3 database read-only relative to profile path'''
 
-      return util.open_database(str(self.profile.path.joinpath(*path)),
-                                readonly=True)
+      return util.open_database(str(self._path(*path)), readonly=True)
+
+   def _snapshot(self, *path: Union[str, Path]) -> Optional[Connection]:
+      """Returns connection to the snapshot of a database relative to profile
+      path, the snapshot is taken on first use
+
+      Returns:
+         ``None`` if the reader is realtime
+      """
+      if self.realtime:
+         return None
+
+      file = self._path(*path)
+
+      snapshot = self._snapshots.get(file)
+      if snapshot is None:
+         snapshot = util.SnapshotConnection(file)
+         self._snapshots[file] = snapshot
+
+      return snapshot.conn
 
    # ABSTRACT #
    @abstractmethod
@@ -141,14 +196,32 @@ class Reader(ABC):
       raise NotImplementedError()
 
    @abstractmethod
-   def history(self) -> Iterator[URLVisit]:
+   def history(self,
+               since: Optional[HistoryWatermark] = None) -> Iterator[URLVisit]:
       """Gets browsing history
 
+      Arguments:
+         since: Read only urls visited after the watermark (oldest first), the
+            watermark is advanced while reading so it can be stored and reused
+            for the next extraction
+
       Returns:
          A generator of :class:`.common.URLVisit`
       """
       raise NotImplementedError()
 
+   @abstractmethod
+   def history_columns(
+       self,
+       since: Optional[HistoryWatermark] = None) -> Iterator[HistoryColumns]:
+      """Gets browsing history in columnar batches of at most ``batch_size``
+      urls, same as :meth:`history` but without creating an object per url
+
+      Returns:
+         A generator of :class:`.common.HistoryColumns`
+      """
+      raise NotImplementedError()
+
    @abstractmethod
    def bookmarks(self) -> Optional[Bookmark]:
       """Gets bookmarks
@@ -167,6 +240,16 @@ class Reader(ABC):
       """
       raise NotImplementedError()
 
+   @abstractmethod
+   def cookies_columns(self) -> Iterator[CookieColumns]:
+      """Gets cookies in columnar batches of at most ``batch_size`` cookies,
+      same as :meth:`cookies` but without creating an object per cookie
+
+      Returns:
+         A generator of :class:`.common.CookieColumns`
+      """
+      raise NotImplementedError()
+
 
 class Writer(ABC):
    """Base class for browser profile writer
@@ -190,8 +273,8 @@ class Writer(ABC):
    def __exit__(self, *args: Any) -> None:
       self.close()
 
-   def _open_database(self,
-                      *path: str) -> Union[Connection, util.TempConnection]:
+   def _open_database(
+       self, *path: str) -> Union[Connection, util.SnapshotConnection]:
       '''Opens a database and locks it'''
       return util.open_database(self.profile.path.joinpath(*path), lock=True)
 
@@ -221,3 +304,4 @@ class Writer(ABC):
    def write_cookies(self, cookies: Any, append: bool = False) -> None:
       '''TODO'''
       raise NotImplementedError()
+
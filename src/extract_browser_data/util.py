@@ -20,10 +20,16 @@ import shutil
 import sqlite3
 import sys
 import tempfile
+import time
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from sqlite3 import Connection
-from typing import Any, Optional, Tuple, Union
+from sqlite3 import Connection, Cursor
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+DEFAULT_BATCH_SIZE = 1000
+'''Default number of rows fetched at once when iterating over a database'''
 
 
 class Platform(Enum):
@@ -74,6 +80,12 @@ class UnsupportedSchema(RuntimeError):
       super().__init__(msg)
 
 
+def intern_all(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+   '''Interns strings so that repeated values share the same object'''
+   intern = sys.intern
+   return [intern(i) if i is not None else None for i in values]
+
+
 def read_database_version(conn: Connection,
                           use_meta: bool = False) -> Tuple[int, int]:
    """Reads version of database
@@ -136,27 +148,237 @@ def is_database_locked(db: Union[str, Path]) -> bool:
    return False
 
 
-class TempConnection:
-   """Wrapper around sqlite database and a tempfile
+SNAPSHOT_SPILL_THRESHOLD = 256 * 1024 * 1024
+'''Size in bytes above which database snapshots are stored in a file instead
+of memory'''
+
+SNAPSHOT_RETRIES = 5
+'''Number of attempts at copying a database that is being modified'''
+
+
+def _default_spill_dir() -> Optional[str]:
+   '''Returns tmpfs directory if available so spilled snapshots stay in memory
+   too, otherwise ``None`` which means default temporary directory'''
+   if os.path.isdir('/dev/shm'):
+      return '/dev/shm'
+
+   return None
+
+
+def _read_database_image(path: Union[str, Path]) -> bytearray:
+   '''Reads the whole database file into a buffer allocated only once'''
+   with open(path, 'rb', buffering=0) as file:
+      size = os.fstat(file.fileno()).st_size
+      data = bytearray(size)
+
+      view = memoryview(data)
+      read = 0
+      while read < size:
+         n = file.readinto(view[read:])
+         if not n:
+            break
+
+         read += n
+
+   del data[read:]
+
+   # in-memory databases cannot be in WAL mode so the file format version
+   # is switched back to legacy (rollback journal)
+   if len(data) >= 20 and data[18] == 2:
+      data[18] = data[19] = 1
+
+   return data
+
+
+class SnapshotError(RuntimeError):
+   """Error raised when a consistent snapshot of a database could not be taken
+   because the database kept changing while it was copied
+
+   Arguments:
+      file_path: Path to the database file
+   """
+   def __init__(self, file_path: Union[str, Path]) -> None:
+      self.file_path = Path(file_path)
+
+      super().__init__(
+          "Could not take a consistent snapshot of database '{}'".format(
+              self.file_path))
 
-   Copies a database file into a tempfile and then opens it, when it's closed
-   the tempfile is deleted and connection to the database is also closed
+
+def _file_state(path: Union[str, Path]) -> Optional[Tuple[int, int]]:
+   '''Returns size and modification time of the file or ``None`` if it does
+   not exist'''
+   try:
+      stat = os.stat(path)
+   except FileNotFoundError:
+      return None
+
+   return stat.st_size, stat.st_mtime_ns
+
+
+def _is_locked_error(err: sqlite3.OperationalError) -> bool:
+   return str(err) in ('database is locked', 'database table is locked')
+
+
+class SnapshotConnection:
+   """Read-only point-in-time snapshot of a sqlite database
+
+   If the database is not locked the snapshot is taken using the backup API
+   which includes the contents of the write-ahead log, otherwise the database
+   file and its write-ahead log (``-wal``) are copied and sqlite recovers the
+   log when opening the copy; the files are checked before and after copying
+   and the copy is retried if they changed in the meantime
+
+   The snapshot is kept in an in-memory database so no data is written to the
+   disk (a locked database without write-ahead log is loaded directly using
+   :meth:`sqlite3.Connection.deserialize`), if the database is larger than
+   ``spill_threshold`` the snapshot is stored in a temporary directory in
+   ``spill_dir`` instead (tmpfs is preferred when available)
 
    Warning:
-      The instance must be closed otherwise it will leave the tempfile undeleted
+      The instance must be closed otherwise it may leave the tempfile undeleted
       with data inside which may or may not be a security risk
 
    Arguments:
       path: Path to the database file
+      spill_threshold: Size in bytes above which the snapshot is stored in a
+         file (default :data:`SNAPSHOT_SPILL_THRESHOLD`)
+      spill_dir: Directory where the file snapshots are stored
+      retries: How many times to try copying a database that is being
+         modified before giving up with :class:`SnapshotError`
    """
-   def __init__(self, path: Union[str, Path]) -> None:
-      with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
-         self.file_path = tmpfile.name
+   file_path: Optional[str]
+
+   def __init__(self,
+                path: Union[str, Path],
+                spill_threshold: Optional[int] = None,
+                spill_dir: Optional[str] = None,
+                retries: int = SNAPSHOT_RETRIES) -> None:
+      if spill_threshold is None:
+         spill_threshold = SNAPSHOT_SPILL_THRESHOLD
+
+      if spill_dir is None:
+         spill_dir = _default_spill_dir()
+
+      self.file_path = None
+      self._spill_dir = spill_dir
+      self._temp_dir: Optional[str] = None
+
+      wal_path = str(path) + '-wal'
+      wal_state = _file_state(wal_path)
+
+      size = os.path.getsize(path)
+      if wal_state is not None:
+         size += wal_state[0]
+
+      in_memory = size <= spill_threshold
+
+      if in_memory:
+         self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+      else:
+         self.file_path = os.path.join(self._make_temp_dir(), 'snapshot')
+         self.conn = sqlite3.connect(self.file_path, check_same_thread=False)
+
+      try:
+         if not self._backup(path):
+            self._copy(path, wal_path, retries)
+
+         self.conn.execute('PRAGMA query_only = ON')
+      except BaseException:
+         self.close()
+         raise
+
+   def _make_temp_dir(self) -> str:
+      if self._temp_dir is None:
+         self._temp_dir = tempfile.mkdtemp(dir=self._spill_dir)
+
+      return self._temp_dir
 
-         with open(path, 'rb') as file:
-            shutil.copyfileobj(file, tmpfile)
+   def _backup(self, path: Union[str, Path]) -> bool:
+      '''Takes the snapshot using the backup API, returns ``False`` if the
+      database is locked'''
+      source = sqlite3.connect(f'file:{path}?mode=ro', uri=True, timeout=0)
 
-      self.conn = sqlite3.connect(f'file:{self.file_path}?mode=ro', uri=True)
+      try:
+         source.backup(self.conn)
+      except sqlite3.OperationalError as err:
+         if _is_locked_error(err):
+            return False
+
+         raise err from None
+      finally:
+         source.close()
+
+      return True
+
+   def _copy(self, path: Union[str, Path], wal_path: str, retries: int) -> None:
+      '''Takes the snapshot by copying the files of a locked database'''
+      for attempt in range(retries):
+         if attempt > 0:
+            time.sleep(0.05 * attempt)
+
+         state = (_file_state(path), _file_state(wal_path))
+         has_wal = state[1] is not None and state[1][0] > 0
+
+         if not has_wal and self.file_path is None and hasattr(
+             self.conn, 'deserialize'):
+            image = _read_database_image(path)
+
+            if state == (_file_state(path), _file_state(wal_path)):
+               self.conn.deserialize(image)  # type: ignore
+
+               # a torn image usually has a broken header or schema
+               try:
+                  self.conn.execute('SELECT count(*) FROM sqlite_master')
+               except sqlite3.DatabaseError:
+                  continue
+
+               return
+
+            continue
+
+         copy_path = os.path.join(self._make_temp_dir(), 'copy')
+         for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(copy_path + suffix):
+               os.remove(copy_path + suffix)
+
+         shutil.copyfile(path, copy_path)
+         if has_wal:
+            shutil.copyfile(wal_path, copy_path + '-wal')
+
+         if state != (_file_state(path), _file_state(wal_path)):
+            continue
+
+         # the write-ahead log is recovered when the copy is opened, frames
+         # that were only partially written are ignored by sqlite
+         copy = sqlite3.connect(copy_path, check_same_thread=False)
+         try:
+            copy.execute('SELECT count(*) FROM sqlite_master')
+
+            if self.file_path is None:
+               copy.backup(self.conn)
+         except sqlite3.DatabaseError:
+            copy.close()
+            continue
+
+         if self.file_path is None:
+            copy.close()
+
+            for suffix in ('', '-wal', '-shm'):
+               if os.path.exists(copy_path + suffix):
+                  os.remove(copy_path + suffix)
+         else:
+            # the copy is used as the snapshot directly
+            self.conn.close()
+            if os.path.exists(self.file_path):
+               os.remove(self.file_path)
+
+            self.conn = copy
+            self.file_path = copy_path
+
+         return
+
+      raise SnapshotError(path)
 
    def __enter__(self) -> Connection:
       return self.conn
@@ -165,14 +387,21 @@ class TempConnection:
       self.close()
 
    def close(self) -> None:
-      '''Closes the connection and deletes the tempfile'''
+      '''Closes the connection and deletes the temporary files if any'''
       self.conn.close()
-      os.remove(self.file_path)
+
+      if self._temp_dir is not None:
+         shutil.rmtree(self._temp_dir, ignore_errors=True)
+         self._temp_dir = None
+
+
+# kept for backwards compatibility
+TempConnection = SnapshotConnection
 
 
 def open_database(path: Union[str, Path],
                   readonly: bool = False,
-                  lock: bool = False) -> Union[Connection, TempConnection]:
+                  lock: bool = False) -> Union[Connection, SnapshotConnection]:
    """Opens a sqlite database (locked database will be copied to memory if
    readonly is true)
 
@@ -181,14 +410,14 @@ def open_database(path: Union[str, Path],
       readonly: Should the database be open read-only
 
    Returns:
-      Connection to :class:`sqlite3.Connection` or :class:`TempConnection` if
-      the database is locked and ``readonly`` is true
+      Connection to :class:`sqlite3.Connection` or :class:`SnapshotConnection`
+      if the database is locked and ``readonly`` is true
    """
    assert not (readonly and lock), 'cannot lock a readonly database'
 
    if readonly:
       if is_database_locked(path):
-         return TempConnection(path)
+         return SnapshotConnection(path)
 
       conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
    else:
@@ -196,3 +425,62 @@ def open_database(path: Union[str, Path],
       conn = sqlite3.connect(path, isolation_level='EXCLUSIVE')
 
    return conn
+
+
+@contextmanager
+def use_database(path: Union[str, Path],
+                 conn: Optional[Connection] = None) -> Iterator[Connection]:
+   """Opens a sqlite database read-only for the duration of the with block,
+   unless an already open connection is supplied in which case it is borrowed
+   and left open
+
+   The database opened is closed when the block exits, so a generator reading
+   inside the block releases it as soon as it's closed or garbage collected
+
+   Arguments:
+      path: Path to the database file
+      conn: Connection to use instead of opening the database (usually a
+         snapshot owned by :class:`.profile.Reader`)
+   """
+   if conn is not None:
+      yield conn
+      return
+
+   db = open_database(path, readonly=True)
+
+   try:
+      yield db.conn if isinstance(db, SnapshotConnection) else db
+   finally:
+      db.close()
+
+
+def iter_batches(cur: Cursor,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Any]]:
+   """Iterates over rows of the query in lists of at most ``batch_size`` rows
+   so only one batch is kept in memory
+
+   The cursor is closed as soon as the iteration stops, even if it's stopped
+   early
+
+   Arguments:
+      cur: Cursor of an executed query
+      batch_size: Number of rows fetched at once
+   """
+   try:
+      while True:
+         rows = cur.fetchmany(batch_size)
+         if not rows:
+            return
+
+         yield rows
+   finally:
+      cur.close()
+
+
+def iter_rows(cur: Cursor,
+              batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Any]:
+   """Iterates over rows of the query fetching ``batch_size`` rows at a time
+   (see :func:`iter_batches`)
+   """
+   for rows in iter_batches(cur, batch_size):
+      yield from rows
@@ -1,6 +1,7 @@
 # pylint: disable=unused-argument,redefined-outer-name
 
 import os
+import sqlite3
 from distutils import dir_util
 from pathlib import Path
 
@@ -23,3 +24,74 @@ def blank_profile(tmpdir, xvfb):
    FirefoxWrapper(tmpdir).start().stop()
 
    return tmpdir
+
+
+def create_places(path):
+   '''Creates minimal places.sqlite with a couple of visits and bookmarks'''
+   conn = sqlite3.connect(str(path))
+   conn.executescript(r'''
+      PRAGMA user_version = 53;
+      CREATE TABLE moz_places (id INTEGER PRIMARY KEY, url LONGVARCHAR,
+         title LONGVARCHAR, rev_host LONGVARCHAR,
+         visit_count INTEGER DEFAULT 0, hidden INTEGER DEFAULT 0 NOT NULL,
+         last_visit_date INTEGER);
+      CREATE TABLE moz_bookmarks (id INTEGER PRIMARY KEY, type INTEGER,
+         fk INTEGER DEFAULT NULL, parent INTEGER, position INTEGER,
+         title LONGVARCHAR, dateAdded INTEGER, lastModified INTEGER);
+
+      INSERT INTO moz_places VALUES
+         (1, 'https://example.com/', 'Example', 'moc.elpmaxe.', 2, 0,
+          1600000000000000),
+         (2, 'https://www.example.com/page', 'Page', 'moc.elpmaxe.www.', 1,
+          0, 1600000100000000),
+         (3, 'https://mozilla.org/', 'Mozilla', 'gro.allizom.', 5, 0,
+          1600000200000000),
+         (4, 'https://never.visited/', NULL, 'detisiv.reven.', 0, 0, NULL);
+
+      INSERT INTO moz_bookmarks VALUES
+         (1, 2, NULL, 0, 0, '', 1, 1),
+         (2, 2, NULL, 1, 0, 'menu', 1, 1),
+         (3, 2, NULL, 1, 1, 'toolbar', 1, 1),
+         (4, 2, NULL, 1, 2, 'tags', 1, 1),
+         (5, 2, NULL, 1, 3, 'unfiled', 1, 1),
+         (6, 2, NULL, 1, 4, 'mobile', 1, 1),
+         (7, 2, NULL, 3, 0, 'Folder', 1, 1),
+         (8, 1, 1, 3, 1, 'Example', 1, 1),
+         (9, 1, 3, 7, 0, 'Mozilla', 1, 1);
+   ''')
+   conn.commit()
+   conn.close()
+
+
+def create_cookies(path):
+   '''Creates minimal cookies.sqlite with a few cookies'''
+   conn = sqlite3.connect(str(path))
+   conn.executescript(r'''
+      PRAGMA user_version = 10;
+      CREATE TABLE moz_cookies (id INTEGER PRIMARY KEY, baseDomain TEXT,
+         originAttributes TEXT NOT NULL DEFAULT '', name TEXT, value TEXT,
+         host TEXT, path TEXT, expiry INTEGER, lastAccessed INTEGER,
+         creationTime INTEGER);
+      CREATE INDEX moz_basedomain ON moz_cookies (baseDomain,
+         originAttributes);
+
+      INSERT INTO moz_cookies VALUES
+         (1, 'example.com', '', 'session', 'abc', '.example.com', '/',
+          4102444800, 1600000000000000, 1600000000000000),
+         (2, 'example.com', '^userContextId=2', 'lang', 'en',
+          'www.example.com', '/', 4102444800, 1600000100000000,
+          1600000100000000),
+         (3, 'mozilla.org', '', 'old', 'x', 'mozilla.org', '/', 1000,
+          1600000200000000, 1600000200000000);
+   ''')
+   conn.commit()
+   conn.close()
+
+
+@pytest.fixture
+def synthetic_profile(tmpdir):
+   '''Profile with small databases that does not require Firefox executable'''
+   create_places(tmpdir / 'places.sqlite')
+   create_cookies(tmpdir / 'cookies.sqlite')
+
+   return tmpdir
@@ -0,0 +1,79 @@
+# pylint: disable=unused-argument
+
+import sqlite3
+
+import extract_browser_data as ebd
+import pytest
+from extract_browser_data.common import HistoryWatermark
+
+
+def add_visit(profile):
+   conn = sqlite3.connect(str(profile / 'places.sqlite'))
+   conn.execute(r'''INSERT INTO moz_places VALUES
+                    (5, 'https://new.example/', 'New', 'elpmaxe.wen.', 1, 0,
+                     1600000300000000)''')
+   conn.commit()
+   conn.close()
+
+
+def test_ff_reader_snapshot(synthetic_profile):
+   with ebd.FirefoxProfile(None, synthetic_profile).reader() as reader:
+      assert len(list(reader.history())) == 3
+
+      add_visit(synthetic_profile)
+
+      # served from the snapshot taken on first use
+      assert len(list(reader.history())) == 3
+      assert reader.bookmarks() is not None
+
+      snapshots = list(reader._snapshots.values())
+      assert len(snapshots) == 1
+
+   with pytest.raises(sqlite3.ProgrammingError):
+      snapshots[0].conn.execute('SELECT 1')
+
+
+def test_ff_reader_realtime(synthetic_profile):
+   reader = ebd.FirefoxProfile(None, synthetic_profile).reader(realtime=True)
+   assert len(list(reader.history())) == 3
+
+   add_visit(synthetic_profile)
+
+   assert len(list(reader.history())) == 4
+   assert not reader._snapshots
+
+
+def test_ff_reader_history_since(synthetic_profile):
+   reader = ebd.FirefoxProfile(None, synthetic_profile).reader(realtime=True)
+
+   watermark = HistoryWatermark()
+   visits = list(reader.history(since=watermark))
+   assert [i.title for i in visits] == ['Example', 'Page', 'Mozilla']
+   assert watermark == HistoryWatermark(1600000200000000, 3)
+
+   # nothing changed since
+   watermark = HistoryWatermark.from_json(watermark.to_json())
+   assert not list(reader.history(since=watermark))
+
+   add_visit(synthetic_profile)
+   assert [i.title for i in reader.history(since=watermark)] == ['New']
+
+
+def test_ff_reader_columns(synthetic_profile):
+   reader = ebd.FirefoxProfile(None, synthetic_profile).reader(realtime=True,
+                                                               batch_size=2)
+
+   batches = list(reader.history_columns())
+   assert [len(i) for i in batches] == [2, 1]
+   assert batches[0].last_visit[0] == 1600000200000000
+
+   objects = [j for i in batches for j in i.to_objects()]
+   for a, b in zip(objects, reader.history()):
+      assert (a.url, a.title, a.last_visit,
+              a.visit_count) == (b.url, b.title, b.last_visit, b.visit_count)
+
+   objects = [j for i in reader.cookies_columns() for j in i.to_objects()]
+   for a, b in zip(objects, reader.cookies()):
+      assert (a.name, a.expiry, a.date_added, a.last_accessed,
+              a.extras) == (b.name, b.expiry, b.date_added, b.last_accessed,
+                            b.extras)
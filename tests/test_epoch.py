@@ -0,0 +1,54 @@
+from array import array
+from datetime import datetime
+
+from extract_browser_data import epoch
+from extract_browser_data.chromium.util import dt_from_webkit_epoch
+from extract_browser_data.common import URLVisit
+from extract_browser_data.firefox.util import TimeUnit, dt_from_epoch
+
+DATE = datetime(2020, 9, 13, 12, 26, 40, 123456)
+UNIX = 1600000000123456
+
+
+def test_conversion():
+   assert epoch.from_unix_us(UNIX) == DATE
+   assert epoch.to_unix_us(DATE) == UNIX
+   assert epoch.from_unix_us(None) is None
+
+   assert dt_from_epoch(UNIX, TimeUnit.Microseconds) == DATE
+   assert dt_from_epoch(1600000000) == DATE.replace(microsecond=0)
+   assert dt_from_webkit_epoch(UNIX + epoch.WEBKIT_EPOCH_OFFSET) == DATE
+   assert dt_from_webkit_epoch(0) == datetime(1601, 1, 1)
+
+
+def test_to_datetimes(monkeypatch):
+   column = array('q', [UNIX, epoch.NULL_TIMESTAMP, 0])
+   expected = [DATE, None, epoch.UNIX_EPOCH]
+
+   assert epoch.to_datetimes(column) == expected
+
+   # pure python fallback
+   monkeypatch.setattr(epoch, 'numpy', None)
+   assert epoch.to_datetimes(column) == expected
+   assert epoch.to_datetimes(list(column)) == expected
+
+
+def test_webkit_to_unix_column():
+   webkit = UNIX + epoch.WEBKIT_EPOCH_OFFSET
+   column = epoch.webkit_to_unix_column([webkit, None])
+   assert list(column) == [UNIX, epoch.NULL_TIMESTAMP]
+
+
+def test_lazy_timestamp():
+   visit = URLVisit('https://example.com/', 'Example', UNIX, 1)
+
+   # kept raw until accessed
+   assert visit._last_visit == UNIX
+   assert URLVisit.last_visit.raw(visit) == UNIX
+
+   assert visit.last_visit == DATE
+   assert visit._last_visit == DATE
+   assert URLVisit.last_visit.raw(visit) == UNIX
+
+   visit.last_visit = None
+   assert visit.last_visit is None
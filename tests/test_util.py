@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+from extract_browser_data import util
+
+
+@pytest.fixture
+def numbers(tmpdir):
+   path = tmpdir / 'numbers.sqlite'
+
+   conn = sqlite3.connect(str(path))
+   conn.execute('CREATE TABLE numbers (n INTEGER)')
+   conn.executemany('INSERT INTO numbers VALUES (?)',
+                    [(i, ) for i in range(10)])
+   conn.commit()
+   conn.close()
+
+   return path
+
+
+def test_iter_rows(numbers):
+   with util.use_database(numbers) as conn:
+      cur = conn.execute('SELECT n FROM numbers ORDER BY n')
+      assert [i for i, in util.iter_rows(cur, 3)] == list(range(10))
+
+
+def test_iter_rows_stopped_early(numbers):
+   with util.use_database(numbers) as conn:
+      cur = conn.execute('SELECT n FROM numbers ORDER BY n')
+
+      rows = util.iter_rows(cur, 3)
+      assert next(rows) == (0, )
+      rows.close()
+
+      with pytest.raises(sqlite3.ProgrammingError):
+         cur.fetchone()
+
+
+def test_use_database_closes(numbers):
+   with util.use_database(numbers) as conn:
+      pass
+
+   with pytest.raises(sqlite3.ProgrammingError):
+      conn.execute('SELECT 1')
+
+
+def test_use_database_borrowed(numbers):
+   borrowed = sqlite3.connect(str(numbers))
+
+   with util.use_database(numbers, borrowed) as conn:
+      assert conn is borrowed
+
+   # borrowed connection is left open
+   assert borrowed.execute('SELECT count(*) FROM numbers').fetchone() == (10, )
+
+
+def test_snapshot_in_memory(numbers):
+   with util.SnapshotConnection(numbers) as conn:
+      assert conn.execute('SELECT count(*) FROM numbers').fetchone() == (10, )
+
+      with pytest.raises(sqlite3.OperationalError):
+         conn.execute('DELETE FROM numbers')
+
+
+def test_snapshot_spilled(numbers, tmpdir):
+   spill_dir = tmpdir.mkdir('spill')
+
+   snapshot = util.SnapshotConnection(numbers,
+                                      spill_threshold=0,
+                                      spill_dir=str(spill_dir))
+   assert snapshot.file_path is not None
+   assert len(spill_dir.listdir()) == 1
+   assert snapshot.conn.execute('SELECT count(*) FROM numbers').fetchone() == (
+       10, )
+
+   snapshot.close()
+   assert not spill_dir.listdir()
+
+
+@pytest.fixture
+def locked_wal(numbers):
+   '''Database in WAL mode with uncheckpointed changes that is locked the same
+   way Firefox locks its databases'''
+   conn = sqlite3.connect(str(numbers))
+   conn.execute('PRAGMA journal_mode = WAL')
+   conn.execute('PRAGMA wal_autocheckpoint = 0')
+   conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+   conn.execute('INSERT INTO numbers VALUES (10)')
+   conn.commit()
+
+   yield numbers
+
+   conn.close()
+
+
+def test_snapshot_locked_wal(locked_wal):
+   assert util.is_database_locked(locked_wal)
+
+   with util.SnapshotConnection(locked_wal) as conn:
+      # includes the changes that are only in the write-ahead log
+      assert conn.execute('SELECT count(*) FROM numbers').fetchone() == (11, )
+
+
+def test_snapshot_locked_wal_spilled(locked_wal, tmpdir):
+   spill_dir = tmpdir.mkdir('spill')
+
+   with util.SnapshotConnection(locked_wal,
+                                spill_threshold=0,
+                                spill_dir=str(spill_dir)) as conn:
+      assert conn.execute('SELECT count(*) FROM numbers').fetchone() == (11, )
+
+   assert not spill_dir.listdir()
+
+
+def test_snapshot_torn(numbers, monkeypatch):
+   # simulates database that is modified during every copy
+   states = iter(range(100))
+   monkeypatch.setattr(util, '_file_state', lambda path: next(states))
+   monkeypatch.setattr(util, '_is_locked_error', lambda err: True)
+   monkeypatch.setattr(util.time, 'sleep', lambda secs: None)
+
+   conn = sqlite3.connect(str(numbers))
+   conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+   conn.execute('BEGIN EXCLUSIVE')
+
+   try:
+      with pytest.raises(util.SnapshotError):
+         util.SnapshotConnection(numbers, retries=3)
+   finally:
+      conn.close()